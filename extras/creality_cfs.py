@@ -7,14 +7,24 @@ used for communication over RS485.
 """
 
 import enum
+import os
+import struct
 import serial
 import serial.rs485
 import logging
 from functools import singledispatch
-from dataclasses import dataclass, field, fields
+from dataclasses import FrozenInstanceError
 from typing import Union, Optional, List, Literal
 
+try:
+    import cffi
+except ImportError:
+    cffi = None
+
 logger = logging.getLogger(__name__)
+# looked up once here rather than in every BoxCfg/BoxAction init
+boxcfg_logger = logging.getLogger("extras.creality_cfs.BoxCfg")
+boxaction_logger = logging.getLogger("extras.creality_cfs.BoxAction")
 
 @singledispatch
 def force_to_bytes(value):
@@ -38,7 +48,11 @@ def force_to_bytes(value):
 
 @force_to_bytes.register(list)
 def _(value):
-    """Convert a list to bytes by joining the bytes representation of each element."""
+    """
+    Convert a list to bytes by joining the bytes representation of each element.
+
+    Only used for caller-supplied lists; packages store their data as bytes.
+    """
     return b''.join(map(force_to_bytes, value))
 
 
@@ -54,10 +68,59 @@ def _(value):
     return value.encode()
 
 
+# Every single byte value, so ints convert by index instead of building bytes
+_INT_BYTES = tuple(bytes((i,)) for i in range(256))
+
+
 @force_to_bytes.register(int)
-def _(value):
-    """Convert an integer to a single byte in big-endian format."""
-    return value.to_bytes(1, 'big')
+def _int_to_bytes(value):
+    """Convert an integer in range(256) to a single byte, raising ValueError otherwise."""
+    if 0 <= value < 256:
+        return _INT_BYTES[value]
+    raise ValueError("bytes must be in range(0, 256)")
+
+
+def _list_to_bytes(value):
+    """
+    Convert a list to bytes, in a single bytes() call when it only holds ints.
+
+    Lists with other elements (e.g. bytes or str) use force_to_bytes.
+    """
+    try:
+        return bytes(value)
+    except TypeError:
+        return force_to_bytes(value)
+
+
+# exact-type converters for the hot serialization paths
+_TO_BYTES = {
+    int: _int_to_bytes,
+    bytes: lambda value: value,
+    bytearray: bytes,
+    memoryview: bytes,
+    str: str.encode,
+    list: _list_to_bytes,
+}
+
+
+def _to_bytes(value):
+    """
+    Convert a value to bytes using an exact-type lookup table.
+
+    Behaves like force_to_bytes, but skips the singledispatch MRO lookup for
+    the common types; anything else (e.g. enum members) falls back to it.
+
+    Args:
+        value: The value to convert to bytes
+
+    Returns:
+        bytes: The value converted to bytes
+    """
+    convert = _TO_BYTES.get(type(value))
+    if convert is None:
+        return force_to_bytes(value)
+
+    return convert(value)
 
 
 @enum.unique
@@ -128,6 +191,11 @@ class ResponseState(enum.IntEnum):
     SPEED_ERR = 0x51
     ENWIND_ERR = 0x52
 
+# value lookups used when formatting packages, avoiding enum construction;
+# the enum's own value -> member map already is the ResponseState lookup
+_COMMAND_NAMES = {command.value: command.name for command in Command}
+_RESPONSE_STATES = ResponseState._value2member_map_
+
 @enum.unique
 class BroadcastAddress(enum.IntEnum):
     """
@@ -156,6 +224,300 @@ class AutomaticAddress(enum.IntEnum):
     CMD_GET_ADDR_TABLE = 0xA3
     CMD_LOADER_TO_APP = 0x0B
 
+
+def _crc8_update(crc: int, byte: int, poly: int = 0x07):
+    """
+    Feed one byte into a CRC8 bit by bit.
+
+    Uses the branchless form of the shift/XOR step, where the polynomial is
+    masked in by the top bit instead of selected with a conditional. Only used
+    to build the lookup tables at import.
+
+    Args:
+        crc: The current CRC8 value
+        byte: The byte to feed in
+        poly: The CRC8 polynomial (without the implicit x^8 term)
+
+    Returns:
+        int: The updated CRC8 value
+    """
+    crc ^= byte
+    for _ in range(8):
+        crc = ((crc << 1) ^ (poly & -((crc >> 7) & 1))) & 0xFF
+
+    return crc
+
+
+def _build_crc8_table(poly: int = 0x07):
+    """
+    Build the 256-entry lookup table for a CRC8 polynomial.
+
+    Each entry is the CRC8 of a single byte, computed with the bit-by-bit
+    algorithm, so that the per-byte update becomes ``table[crc ^ byte]``.
+
+    Args:
+        poly: The CRC8 polynomial (without the implicit x^8 term)
+
+    Returns:
+        tuple: The 256 CRC8 values indexed by byte value
+    """
+    return tuple(_crc8_update(0, seed, poly) for seed in range(256))
+
+
+# kept as a tuple rather than bytes: tuple indexing is the faster path in CPython
+_CRC8_TABLE = _build_crc8_table()
+
+# Inputs at least this long are handed to the C helper or numba (when
+# available); below it the per-call overhead outweighs the interpreter cost of
+# the table loop. Measured crossover is around 25-32 bytes, so typical CFS
+# frames stay on the table loop.
+_CRC8_NATIVE_MIN_LEN = 32
+# Range handled by the pure-Python SWAR path; 256 bytes is the largest CRC
+# input a frame can carry (length byte plus up to 255 bytes after it).
+_CRC8_SWAR_MIN_LEN = 64
+_CRC8_SWAR_MAX_LEN = 256
+# Inputs at least this long go to numpy when neither a compiled backend nor
+# the SWAR path is available, processed in blocks of _CRC8_NUMPY_BLOCK bytes.
+_CRC8_NUMPY_MIN_LEN = 128
+_CRC8_NUMPY_BLOCK = 256
+
+
+def _build_crc8_shift_rows(table, count: int = 4):
+    """
+    Build the position-indexed CRC8 tables used by the slice-by-4 kernel.
+
+    Row ``k`` holds the CRC8 of each byte value followed by ``k`` zero bytes.
+
+    Args:
+        table: The 256-entry CRC8 lookup table
+        count: The number of rows to build
+
+    Returns:
+        tuple: ``count`` rows of 256 CRC8 values each
+    """
+    rows = [tuple(table)]
+    for _ in range(1, count):
+        rows.append(tuple(table[crc] for crc in rows[-1]))
+
+    return tuple(rows)
+
+
+def _build_crc8_parity_masks(poly: int = 0x07, size: int = _CRC8_SWAR_MAX_LEN):
+    """
+    Build the bit masks used by the SWAR CRC8 path.
+
+    With the data read as one big-endian integer, bit ``p`` (counting from the
+    least significant bit) contributes ``x^(p + 8) mod P`` to the checksum, so
+    bit ``j`` of the CRC is the parity of the data ANDed with ``masks[j]``.
+
+    Args:
+        poly: The CRC8 polynomial (without the implicit x^8 term)
+        size: The longest input, in bytes, the masks cover
+
+    Returns:
+        tuple: Eight integer masks, one per CRC bit
+    """
+    masks = [0] * 8
+    # x^(bit + 8) mod P for each bit of the last byte
+    residues = [_crc8_update(0, 1 << bit, poly) for bit in range(8)]
+    for offset in range(0, size * 8, 8):
+        for bit, residue in enumerate(residues):
+            for j in range(8):
+                if residue >> j & 1:
+                    masks[j] |= 1 << (offset + bit)
+        # each byte further from the end multiplies its residues by x^8
+        residues = [_crc8_update(residue, 0, poly) for residue in residues]
+
+    return tuple(masks)
+
+
+# int.bit_count is needed for the SWAR path to beat the table loop (3.10+)
+if hasattr(int, 'bit_count'):
+    _CRC8_PARITY_MASKS = _build_crc8_parity_masks()
+else:
+    _CRC8_PARITY_MASKS = None
+
+
+def _calc_crc8_swar(_data: bytes):
+    """
+    Calculate the CRC8 checksum for the given data with whole-buffer integer ops.
+
+    The data is loaded with a single int.from_bytes and every CRC bit is then
+    one AND and one popcount over all of it, instead of a lookup per byte.
+
+    Args:
+        _data: The data to calculate the checksum for, at most
+            _CRC8_SWAR_MAX_LEN bytes long
+
+    Returns:
+        int: The calculated CRC8 checksum
+    """
+    value = int.from_bytes(_data, 'big')
+    crc = 0
+    for bit, mask in enumerate(_CRC8_PARITY_MASKS):
+        crc |= ((value & mask).bit_count() & 1) << bit
+
+    return crc
+
+
+def _crc8_kernel(buf, tables):
+    """
+    Slice-by-4 CRC8 loop compiled with numba when it is available.
+
+    ``tables[k]`` holds the CRC8 of each byte value followed by ``k`` zero
+    bytes, so four bytes are folded per iteration and only the first lookup
+    depends on the running checksum. This only pays off in compiled code; the
+    pure-Python path keeps the plain byte-at-a-time loop, which is faster there.
+
+    Args:
+        buf: The data to calculate the checksum for
+        tables: The four rows from _build_crc8_shift_rows()
+
+    Returns:
+        int: The calculated CRC8 checksum
+    """
+    t0, t1, t2, t3 = tables[0], tables[1], tables[2], tables[3]
+    end = len(buf) & ~3
+    crc = 0
+    for i in range(0, end, 4):
+        crc = t3[crc ^ buf[i]] ^ t2[buf[i + 1]] ^ t1[buf[i + 2]] ^ t0[buf[i + 3]]
+    for i in range(end, len(buf)):
+        crc = t0[crc ^ buf[i]]
+
+    return crc
+
+
+_CRC8_C_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_crc8.c')
+_CRC8_C_TARGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_crc8.so')
+_CRC8_C_COMPILE = "gcc -Wall -O2 -shared -fPIC -o %s %s"
+_CRC8_C_CDEF = "uint8_t crc8(const uint8_t *data, size_t length);"
+
+
+def _load_crc8_c():
+    """
+    Build (if out of date) and load the CRC8 C helper, in the same way as
+    klippy's chelper module.
+
+    Returns:
+        A function calculating the CRC8 of a bytes-like object, or None if
+        cffi or a compiler is unavailable
+    """
+    if cffi is None or not os.path.exists(_CRC8_C_SOURCE):
+        return None
+
+    try:
+        if (not os.path.exists(_CRC8_C_TARGET)
+                or os.path.getmtime(_CRC8_C_TARGET) < os.path.getmtime(_CRC8_C_SOURCE)):
+            if os.system(_CRC8_C_COMPILE % (_CRC8_C_TARGET, _CRC8_C_SOURCE)):
+                logger.info("Unable to build CRC8 C helper, using the Python implementation")
+                return None
+
+        ffi = cffi.FFI()
+        ffi.cdef(_CRC8_C_CDEF)
+        lib = ffi.dlopen(_CRC8_C_TARGET)
+    except OSError as e:
+        logger.info(f"Unable to load CRC8 C helper ({e}), using the Python implementation")
+        return None
+
+    crc8, from_buffer = lib.crc8, ffi.from_buffer
+
+    def _calc_crc8_c(_data):
+        return crc8(from_buffer(_data), len(_data))
+
+    return _calc_crc8_c
+
+
+_calc_crc8_c = _load_crc8_c()
+
+
+def _load_crc8_numba():
+    """
+    Import numba and compile the slice-by-4 CRC8 kernel.
+
+    Returns:
+        A function calculating the CRC8 of a bytes-like object, or None if
+        numba is unavailable or the kernel fails to build
+    """
+    try:
+        import numba
+        import numpy
+    except ImportError:
+        return None
+
+    tables = numpy.array(_build_crc8_shift_rows(_CRC8_TABLE), dtype=numpy.intp)
+    try:
+        kernel = numba.njit(cache=True, nogil=True)(_crc8_kernel)
+        # compile (or load from the on-disk cache) now rather than on the first frame
+        kernel(b'\x00', tables)
+    except Exception as e:
+        # e.g. a cache written while the module was imported under another name
+        logger.info(f"Unable to compile CRC8 numba kernel ({e}), using the Python implementation")
+        return None
+
+    def _calc_crc8_numba(_data):
+        return int(kernel(_data, tables))
+
+    return _calc_crc8_numba
+
+
+# Only one compiled backend is set up; numba is not even imported when the C
+# helper loads, which keeps its import and JIT warm-up out of Klipper startup.
+_calc_crc8_native = _calc_crc8_c if _calc_crc8_c is not None else _load_crc8_numba()
+
+
+def _load_crc8_numpy():
+    """
+    Import numpy and build the shift table for the numpy CRC8 path.
+
+    Row ``k`` of the table holds the CRC8 of each byte value followed by ``k``
+    zero bytes. Since CRC8 is linear, the checksum of a block is the XOR of
+    ``rows[len - 1 - i][block[i]]`` over all positions, which numpy can gather
+    and reduce without a Python-level loop.
+
+    Returns:
+        A function calculating the CRC8 of a bytes-like object, or None if
+        numpy is unavailable
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    # flattened so a block is gathered with a single take(), using the offset
+    # of the row for each position in the block
+    flat = numpy.array(
+        _build_crc8_shift_rows(_CRC8_TABLE, _CRC8_NUMPY_BLOCK), dtype=numpy.uint8
+    ).ravel()
+    offsets = numpy.arange(_CRC8_NUMPY_BLOCK - 1, -1, -1, dtype=numpy.intp) * 256
+
+    def _calc_crc8_numpy(_data):
+        if not isinstance(_data, (bytes, bytearray, memoryview)):
+            _data = bytes(_data)
+
+        buf = numpy.frombuffer(_data, dtype=numpy.uint8)
+        crc = 0
+        # the running checksum is carried into each block through the table
+        for start in range(0, len(buf), _CRC8_NUMPY_BLOCK):
+            block = buf[start:start + _CRC8_NUMPY_BLOCK]
+            n = len(block)
+            crc = (
+                int(numpy.bitwise_xor.reduce(flat.take(offsets[-n:] + block)))
+                ^ int(flat[(n - 1) * 256 + crc])
+            )
+
+        return crc
+
+    return _calc_crc8_numpy
+
+
+# numpy is only the fast path for long inputs without int.bit_count (before
+# 3.10); elsewhere the SWAR path covers every frame length without an import.
+if _calc_crc8_native is None and _CRC8_PARITY_MASKS is None:
+    _calc_crc8_numpy = _load_crc8_numpy()
+else:
+    _calc_crc8_numpy = None
+
+
 class CRC8Structure:
     """
     Base class for structures that use CRC8 checksums.
@@ -163,6 +525,8 @@ class CRC8Structure:
     Provides methods for calculating and validating CRC8 checksums.
     """
 
+    __slots__ = ()
+
     @staticmethod
     def _calc_crc8(_data: bytes):
         """
@@ -174,11 +538,24 @@ class CRC8Structure:
         Returns:
             int: The calculated CRC8 checksum
         """
+        length = len(_data)
+        # short frames (the common case) go straight to the table loop
+        if length >= _CRC8_NATIVE_MIN_LEN:
+            if _calc_crc8_native is not None:
+                # the compiled helpers take buffers; e.g. lists of ints are converted
+                if not isinstance(_data, (bytes, bytearray, memoryview)):
+                    _data = bytes(_data)
+                return _calc_crc8_native(_data)
+            if (_CRC8_PARITY_MASKS is not None
+                    and _CRC8_SWAR_MIN_LEN <= length <= _CRC8_SWAR_MAX_LEN):
+                return _calc_crc8_swar(_data)
+            if _calc_crc8_numpy is not None and length >= _CRC8_NUMPY_MIN_LEN:
+                return _calc_crc8_numpy(_data)
+
+        table = _CRC8_TABLE
         crc = 0
         for byte in _data:
-            crc ^= byte
-            for _ in range(8):
-                crc = ((crc << 1) ^ 0x07 if crc & 0x80 else crc << 1) & 0xFF
+            crc = table[crc ^ byte]
 
         return crc
 
@@ -199,197 +576,343 @@ class CRC8Structure:
             raise ValueError(f"Invalid CRC8 checksum. {crc} != {_crc}")
 
 
-# removed kw_only and slots parameter as unsupported in 3.9
-@dataclass(order=True, frozen=True)
-class DataPackage(CRC8Structure):
+class CRC8Frame(CRC8Structure):
     """
-    Represents a data package in the CFS protocol.
+    Base class for immutable CRC8-checked frames.
 
-    This class handles the parsing and construction of CFS protocol messages.
+    Subclasses set their fields with object.__setattr__ and cache the complete
+    frame in _mb on construction; equality, hashing and pickling all use it.
+    They also define _MIN_FRAME_LENGTH, the shortest frame they can parse, and
+    _from_trusted(), which builds an instance from a frame with a verified CRC.
     """
 
-    head: int = field(default=0xF7)
-    slave_addr: Union[
-        int,
-        Literal[
-            0x01,  # First material box address
-            0x02,
-            0x03,
-            0x04,
-            0xFE,  # Broadcast address for all boxes
-            0xFF   # Broadcast address for all devices
-        ],
-    ] = field(default=None)
-    length: int = field(default=None)
-    status: int = field(default=None)
-    function_code: int = field(default=None)
-    # noinspection PyDataclass
-    data: list[bytes] = field(default_factory=list)
-    crc: int = field(default=0)
-
-    def __post_init__(self):
-        """
-        Validate the CRC8 checksum after initialization.
+    __slots__ = ('_mb',)
 
-        Raises:
-            ValueError: If the CRC8 checksum is invalid
-        """
-        self.check_crc8(
-            # crc uses only length, status, function_code and data
-            self.message_block[2:-1],
-            self.crc
-        )
+    def __setattr__(self, name, value):
+        """Reject assignment, as the cached frame must match the fields."""
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name):
+        """Reject deletion, as the cached frame must match the fields."""
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
 
     @property
     def message_block(self):
         """
         Get the complete message as bytes.
 
+        The frame is built once on construction and cached on the instance,
+        which is safe as the frame is frozen.
+
         Returns:
             bytes: The complete message
         """
-        return b''.join(
-            force_to_bytes(getattr(self, f.name))
-            for f in fields(self)
-        )
+        return self._mb
 
     @classmethod
     def loads(cls, value: bytes):
         """
-        Parse a bytes object into a DataPackage.
+        Parse a bytes object into a frame of this class.
+
+        The CRC is checked once on the raw frame, which then becomes the
+        cached message block, so nothing is re-serialized.
 
         Args:
             value: The bytes to parse
 
         Returns:
-            DataPackage: The parsed data package
+            CRC8Frame: The parsed frame, an instance of cls
+
+        Raises:
+            ValueError: If the frame is too short or the CRC8 checksum is invalid
+        """
+        if len(value) < cls._MIN_FRAME_LENGTH:
+            raise ValueError(
+                f"Frame too short for {cls.__name__}. "
+                f"{len(value)} < {cls._MIN_FRAME_LENGTH} bytes"
+            )
+        if type(value) is not bytes:
+            value = bytes(value)
+
+        # crc covers the bytes after the first two, up to the crc itself
+        cls.check_crc8(value[2:-1], value[-1])
+
+        return cls._from_trusted(value)
+
+    @classmethod
+    def validate_frame(cls, value: bytes):
+        """
+        Check whether a received frame has a valid length and CRC8 checksum.
+
+        Cheaper than calling loads() on noisy input, as no frame is built
+        and no exception is raised. Accepts any bytes-like object, so slices
+        of a read buffer can be checked without copying.
+
+        Args:
+            value: The bytes to check
+
+        Returns:
+            bool: True if the frame can be parsed by loads()
         """
-        (
-            head,
-            slave_addr,
-            length,
-            status,
-            function_code,
-            *data,
-            crc,
-        ) = value
-
-        return cls(
-            head=head,
-            slave_addr=slave_addr,
-            length=length,
-            status=status,
-            function_code=function_code,
-            data=data,
-            crc=crc,
+        return (
+            len(value) >= cls._MIN_FRAME_LENGTH
+            # crc covers the bytes after the first two, up to the crc itself
+            and cls._calc_crc8(value[2:-1]) == value[-1]
         )
 
+    def __reduce__(self):
+        """
+        Pickle the frame as its wire bytes.
+
+        Returns:
+            tuple: The callable and arguments recreating the frame
+        """
+        return type(self).loads, (self._mb,)
+
     def __hash__(self):
         """
-        Calculate a hash value for the data package.
+        Calculate a hash value for the frame.
 
         Returns:
             int: The hash value
         """
-        return hash(self.message_block)
+        return hash(self._mb)
 
-    def __repr__(self):
+    def __eq__(self, other):
         """
-        Get a string representation of the data package.
+        Compare two frames of the same type by their wire bytes.
 
         Returns:
-            str: A string representation of the data package
+            bool: True if both frames serialize to the same bytes
         """
-        fn = self.function_code
-        if self.function_code in list(Command):
-            fn = Command(self.function_code).name
+        if type(other) is not type(self):
+            return NotImplemented
 
-        status = self.status
-        if self.status in list(ResponseState):
-            status = ResponseState(self.status)
+        return self._mb == other._mb
 
-        return (
-            f"<DataPackage: "
-            f"slave_addr={self.slave_addr} "
-            f"fn={fn} "
-            f"st={status} "
-            f"msg={b''.join(map(force_to_bytes, self.data)).hex()}>"
-        )
 
-# removed kw_only and slots parameter as unsupported in 3.9
-@dataclass(order=True, frozen=True)
-class MessageBlock(CRC8Structure):
+# head, slave_addr, length, status and function_code
+_DATA_PACKAGE_HEADER = struct.Struct('BBBBB')
+# head and length
+_MESSAGE_BLOCK_HEADER = struct.Struct('BB')
+
+
+# plain __slots__ classes, as dataclass(slots=True) is unsupported in 3.9
+class DataPackage(CRC8Frame):
     """
-    Represents a message block in the CFS protocol.
+    Represents a data package in the CFS protocol.
 
-    This class is used for simpler message structures that don't have the full
-    DataPackage format.
+    This class handles the parsing and construction of CFS protocol messages.
+    Packages are immutable; assigning to a field raises FrozenInstanceError.
     """
 
-    head: int = field(default=0xF7)  # always 0xF7
-    length: int = field(default=0)
-    payload: list[bytes] = field(default_factory=list)
-    crc: int = field(default=0)
+    __slots__ = (
+        'head', 'slave_addr', 'length', 'status', 'function_code', 'data', 'crc',
+        '_repr',
+    )
+
+    # head, slave_addr, length, status, function_code and crc
+    _MIN_FRAME_LENGTH = 6
+
+    def __init__(
+        self,
+        head: int = 0xF7,
+        slave_addr: Union[
+            int,
+            Literal[
+                0x01,  # First material box address
+                0x02,
+                0x03,
+                0x04,
+                0xFE,  # Broadcast address for all boxes
+                0xFF   # Broadcast address for all devices
+            ],
+        ] = None,
+        length: int = None,
+        status: int = None,
+        function_code: int = None,
+        data: bytes = b'',
+        crc: Optional[int] = None,
+    ):
+        """
+        Create a data package, validating its CRC8 checksum and caching the frame.
+
+        When no crc is given (e.g. for a package about to be sent) it is
+        calculated instead of checked.
+
+        Args:
+            head: The frame head, always 0xF7
+            slave_addr: The address of the box, or a broadcast address
+            length: The number of bytes following the length byte
+            status: The response state
+            function_code: The command code
+            data: The command or response data as bytes; a list, bytearray,
+                memoryview or str (UTF-8 encoded) is converted to bytes
+            crc: The CRC8 checksum, or None to calculate it
+
+        Raises:
+            ValueError: If a header field is not a byte or the CRC8 checksum is invalid
+        """
+        if type(data) is not bytes:
+            data = _to_bytes(data)
+
+        try:
+            header = _DATA_PACKAGE_HEADER.pack(head, slave_addr, length, status, function_code)
+        except struct.error as e:
+            raise ValueError(f"Invalid DataPackage header: {e}") from None
+
+        mb = header + data
+        # crc uses only length, status, function_code and data
+        if crc is None:
+            crc = self._calc_crc8(mb[2:])
+        else:
+            self.check_crc8(mb[2:], crc)
+
+        set_field = object.__setattr__
+        set_field(self, 'head', head)
+        set_field(self, 'slave_addr', slave_addr)
+        set_field(self, 'length', length)
+        set_field(self, 'status', status)
+        set_field(self, 'function_code', function_code)
+        set_field(self, 'data', data)
+        set_field(self, 'crc', crc)
+        set_field(self, '_mb', mb + bytes((crc,)))
+        set_field(self, '_repr', None)
 
     @classmethod
-    def loads(cls, value: bytes):
+    def _from_trusted(cls, value: bytes):
         """
-        Parse a bytes object into a MessageBlock.
+        Build a DataPackage from a frame whose CRC has already been verified.
+
+        Fields are set directly, bypassing __init__ and its CRC check.
 
         Args:
-            value: The bytes to parse
+            value: The complete frame as bytes
 
         Returns:
-            MessageBlock: The parsed message block
+            DataPackage: The data package for the frame
         """
-        (
-            head,
-            length,
-            *payload,
-            crc,
-        ) = value
-
-        return cls(
-            head=head,
-            length=length,
-            payload=payload,
-            crc=crc,
-        )
+        head, slave_addr, length, status, function_code = _DATA_PACKAGE_HEADER.unpack_from(value)
+
+        item = object.__new__(cls)
+        set_field = object.__setattr__
+        set_field(item, 'head', head)
+        set_field(item, 'slave_addr', slave_addr)
+        set_field(item, 'length', length)
+        set_field(item, 'status', status)
+        set_field(item, 'function_code', function_code)
+        set_field(item, 'data', value[5:-1])
+        set_field(item, 'crc', value[-1])
+        set_field(item, '_mb', value)
+        set_field(item, '_repr', None)
+
+        return item
 
-    @property
-    def message_block(self):
+    def __repr__(self):
         """
-        Get the complete message as bytes.
+        Get a string representation of the data package.
+
+        The string is built on first use and cached, as the package is frozen.
 
         Returns:
-            bytes: The complete message
+            str: A string representation of the data package
         """
-        return b''.join(
-            force_to_bytes(getattr(self, f.name))
-            for f in fields(self)
-        )
+        text = self._repr
+        if text is None:
+            fn = _COMMAND_NAMES.get(self.function_code, self.function_code)
+            status = _RESPONSE_STATES.get(self.status, self.status)
+            text = (
+                f"<DataPackage: "
+                f"slave_addr={self.slave_addr} "
+                f"fn={fn} "
+                f"st={status} "
+                f"msg={self.data.hex()}>"
+            )
+            object.__setattr__(self, '_repr', text)
+
+        return text
+
+# plain __slots__ classes, as dataclass(slots=True) is unsupported in 3.9
+class MessageBlock(CRC8Frame):
+    """
+    Represents a message block in the CFS protocol.
 
-    def __hash__(self):
+    This class is used for simpler message structures that don't have the full
+    DataPackage format. Blocks are immutable; assigning to a field raises
+    FrozenInstanceError.
+    """
+
+    __slots__ = ('head', 'length', 'payload', 'crc')
+
+    # head, length and crc
+    _MIN_FRAME_LENGTH = 3
+
+    def __init__(
+        self,
+        head: int = 0xF7,  # always 0xF7
+        length: int = 0,
+        payload: bytes = b'',
+        crc: Optional[int] = None,
+    ):
         """
-        Calculate a hash value for the message block.
+        Create a message block, validating its CRC8 checksum and caching the frame.
 
-        Returns:
-            int: The hash value
+        When no crc is given (e.g. for a block about to be sent) it is
+        calculated instead of checked.
+
+        Args:
+            head: The frame head, always 0xF7
+            length: The length byte of the block
+            payload: The block payload as bytes; a list, bytearray, memoryview
+                or str (UTF-8 encoded) is converted to bytes
+            crc: The CRC8 checksum, or None to calculate it
+
+        Raises:
+            ValueError: If a header field is not a byte or the CRC8 checksum is invalid
         """
-        return hash(self.message_block)
+        if type(payload) is not bytes:
+            payload = _to_bytes(payload)
+
+        try:
+            header = _MESSAGE_BLOCK_HEADER.pack(head, length)
+        except struct.error as e:
+            raise ValueError(f"Invalid MessageBlock header: {e}") from None
+
+        # crc uses only the payload (frame bytes between length and crc)
+        if crc is None:
+            crc = self._calc_crc8(payload)
+        else:
+            self.check_crc8(payload, crc)
 
-    def __post_init__(self):
+        set_field = object.__setattr__
+        set_field(self, 'head', head)
+        set_field(self, 'length', length)
+        set_field(self, 'payload', payload)
+        set_field(self, 'crc', crc)
+        set_field(self, '_mb', header + payload + bytes((crc,)))
+
+    @classmethod
+    def _from_trusted(cls, value: bytes):
         """
-        Validate the CRC8 checksum after initialization.
+        Build a MessageBlock from a frame whose CRC has already been verified.
 
-        Raises:
-            ValueError: If the CRC8 checksum is invalid
+        Fields are set directly, bypassing __init__ and its CRC check.
+
+        Args:
+            value: The complete frame as bytes
+
+        Returns:
+            MessageBlock: The message block for the frame
         """
-        self.check_crc8(
-            # crc uses only length and payload
-            self.message_block[2:-1],
-            self.crc
-        )
+        item = object.__new__(cls)
+        set_field = object.__setattr__
+        set_field(item, 'head', value[0])
+        set_field(item, 'length', value[1])
+        set_field(item, 'payload', value[2:-1])
+        set_field(item, 'crc', value[-1])
+        set_field(item, '_mb', value)
+
+        return item
 
     def __repr__(self):
         """
@@ -399,88 +922,95 @@ class MessageBlock(CRC8Structure):
             str: A string representation of the message block
         """
         return (
-            f"<MSGBlock: payload={b''.join(map(force_to_bytes, self.payload)).hex()}>"
+            f"<MSGBlock: payload={self.payload.hex()}>"
         )
 
 
 # Stub BoxCfg with known expected attributes used across Klipper
 class BoxCfg:
-    def __init__(self, printer, config):
-        
-        # Default
-        self.printer = printer
-        self.config = config
-        self.logger = logging.getLogger("extras.creality_cfs.BoxCfg")
-        
-        self.logger.info("BoxCfg initializing...")
-
-        # Version Control
-        self.version = config.getint("version", default=1)
-        self.logger.info(f"BoxCfg using version {self.version} as per original [box]")
-        level = config.get('log_level', 'error').upper()
-        self.logger.setLevel(getattr(logging, level, logging.ERROR))
-
+    # (attribute, config option, config getter, default)
+    _SCHEMA = (
         # Positional settings
-        self.pre_cut_pos_x = config.getfloat("pre_cut_pos_x", default=10.0)
-        self.pre_cut_pos_y = config.getfloat("pre_cut_pos_y", default=200.0)
-        self.cut_pos_x = config.getfloat("cut_pos_x", default=-6.5) # this one is commented in [box] for some reason
-        self.cut_pos_y = config.getfloat("cut_pos_y", default=200.0)
-        # self.middle_cut_pos_y = config.getfloat("middle_cut_pos_y", default=0.00) # Recreated as the commented version found within [box]
-        self.clean_left_pos_x = config.getfloat("clean_left_pos_x", default=135.0)
-        self.clean_left_pos_y = config.getfloat("clean_left_pos_y", default=378.0)
-        self.clean_right_pos_x = config.getfloat("clean_right_pos_x", default=160.0)
-        self.clean_right_pos_y = config.getfloat("clean_right_pos_y", default=378.0)
-        self.clean_velocity = config.getfloat("clean_velocity", default=12000.0)
-        self.box_need_clean_length = config.getfloat("box_need_clean_length", default=70.0)
-        self.cut_velocity = config.getfloat("cut_velocity", default=30000.0)
-        self.extrude_pos_x = config.getfloat("extrude_pos_x", default=133.0)
-        self.extrude_pos_y = config.getfloat("extrude_pos_y", default=378.0)
-        self.clean_pos_min_x = config.getfloat("clean_pos_min_x", default=152.0)
-        self.clean_pos_min_y = config.getfloat("clean_pos_min_y", default=362.0)
-        self.clean_pos_max_x = config.getfloat("clean_pos_max_x", default=156.0)
-        self.clean_pos_max_y = config.getfloat("clean_pos_max_y", default=368.0)
+        ('pre_cut_pos_x', 'pre_cut_pos_x', 'getfloat', 10.0),
+        ('pre_cut_pos_y', 'pre_cut_pos_y', 'getfloat', 200.0),
+        ('cut_pos_x', 'cut_pos_x', 'getfloat', -6.5), # this one is commented in [box] for some reason
+        ('cut_pos_y', 'cut_pos_y', 'getfloat', 200.0),
+        # ('middle_cut_pos_y', 'middle_cut_pos_y', 'getfloat', 0.00), # Recreated as the commented version found within [box]
+        ('clean_left_pos_x', 'clean_left_pos_x', 'getfloat', 135.0),
+        ('clean_left_pos_y', 'clean_left_pos_y', 'getfloat', 378.0),
+        ('clean_right_pos_x', 'clean_right_pos_x', 'getfloat', 160.0),
+        ('clean_right_pos_y', 'clean_right_pos_y', 'getfloat', 378.0),
+        ('clean_velocity', 'clean_velocity', 'getfloat', 12000.0),
+        ('box_need_clean_length', 'box_need_clean_length', 'getfloat', 70.0),
+        ('cut_velocity', 'cut_velocity', 'getfloat', 30000.0),
+        ('extrude_pos_x', 'extrude_pos_x', 'getfloat', 133.0),
+        ('extrude_pos_y', 'extrude_pos_y', 'getfloat', 378.0),
+        ('clean_pos_min_x', 'clean_pos_min_x', 'getfloat', 152.0),
+        ('clean_pos_min_y', 'clean_pos_min_y', 'getfloat', 362.0),
+        ('clean_pos_max_x', 'clean_pos_max_x', 'getfloat', 156.0),
+        ('clean_pos_max_y', 'clean_pos_max_y', 'getfloat', 368.0),
 
         # Boolean / flags
-        self.enable_heart_process = config.getboolean("enable_heart_process", default=True)
-        self.enable_filament_sensor = config.getboolean("enable_filament_sensor", default=True)
+        ('enable_heart_process', 'enable_heart_process', 'getboolean', True),
+        ('enable_filament_sensor', 'enable_filament_sensor', 'getboolean', True),
 
         # Material/feed system logic
-        self.tn_retrude = config.getint("Tn_retrude", default=-10) # -60 
-        self.tn_retrude_velocity = config.getint("Tn_retrude_velocity", default=600) # 360
-        self.tn_extrude_temp = config.getint("Tn_extrude_temp", default=220)
-        self.tn_extrude = config.getint("Tn_extrude", default=140) # 120
-        self.tn_extrude_velocity = config.getint("Tn_extrude_velocity", default=360)
+        ('tn_retrude', 'Tn_retrude', 'getint', -10), # -60
+        ('tn_retrude_velocity', 'Tn_retrude_velocity', 'getint', 600), # 360
+        ('tn_extrude_temp', 'Tn_extrude_temp', 'getint', 220),
+        ('tn_extrude', 'Tn_extrude', 'getint', 140), # 120
+        ('tn_extrude_velocity', 'Tn_extrude_velocity', 'getint', 360),
 
         # these arent defined in box, they are pulled from strings
-        self.flush_length = config.getint("flush_length", default=90)
-        self.flush_speed = config.getint("flush_speed", default=300)
-        self.flush_temperature = config.getint("flush_temperature", default=230)
-        self.flush_max_temp = config.getint("flush_max_temp", default=260)
-        self.flush_min_temp = config.getint("flush_min_temp", default=180)
-        self.flush_type = config.getint("flush_type", default=0)
-        self.filament_sensor_type = config.getint("filament_sensor_type", default=1)
+        ('flush_length', 'flush_length', 'getint', 90),
+        ('flush_speed', 'flush_speed', 'getint', 300),
+        ('flush_temperature', 'flush_temperature', 'getint', 230),
+        ('flush_max_temp', 'flush_max_temp', 'getint', 260),
+        ('flush_min_temp', 'flush_min_temp', 'getint', 180),
+        ('flush_type', 'flush_type', 'getint', 0),
+        ('filament_sensor_type', 'filament_sensor_type', 'getint', 1),
 
         # Filament Buffer Block
-        self.buffer_empty_len = config.getint("buffer_empty_len", default=30) # The buffer retraction reserved length is required, and the length reserved for the extrusion buffer is required (the length of the extruder knocking the knife to the extrusion gear)
-        
+        ('buffer_empty_len', 'buffer_empty_len', 'getint', 30), # The buffer retraction reserved length is required, and the length reserved for the extrusion buffer is required (the length of the extruder knocking the knife to the extrusion gear)
+
         # Section for Printers with a Flush Area
         #Is there any need to spit out material? Distinguish between K1_MAX and f008 (K2)
-        self.has_extrude_pos = config.getint("has_extrude_pos", default=1) # this one needs revisiting
-        self.safe_pos_y = config.getfloat("safe_pos_y", default=345)
-        self.safe_pos_x = config.getfloat("safe_pos_x", default=225)
-        self.clean_pos_left_x = config.getfloat("clean_pos_left_x", default=160.0)
-        self.clean_pos_right_x = config.getfloat("clean_pos_right_x", default=170.0)
-        self.clean_pos_middle_y = config.getfloat("clean_pos_middle_y", default=374.0)
-        self.check_cut_pos_x_max = config.getfloat("check_cut_pos_x_max", default=-5.0)
+        ('has_extrude_pos', 'has_extrude_pos', 'getint', 1), # this one needs revisiting
+        ('safe_pos_y', 'safe_pos_y', 'getfloat', 345),
+        ('safe_pos_x', 'safe_pos_x', 'getfloat', 225),
+        ('clean_pos_left_x', 'clean_pos_left_x', 'getfloat', 160.0),
+        ('clean_pos_right_x', 'clean_pos_right_x', 'getfloat', 170.0),
+        ('clean_pos_middle_y', 'clean_pos_middle_y', 'getfloat', 374.0),
+        ('check_cut_pos_x_max', 'check_cut_pos_x_max', 'getfloat', -5.0),
 
-        
         # Handle switch_pin from [box] as a Klipper pin
-        self.switch_pin_str = config.get("switch_pin", None)
-        self.switch_pin = None
+        ('switch_pin_str', 'switch_pin', 'get', None),
 
         # File persistence or state recovery (used in SD virtual saving)
-        self.tn_save_data_path = config.get("tn_save_data_path", default="/mnt/UDISK/tn_save_data.json")
+        ('tn_save_data_path', 'tn_save_data_path', 'get', "/mnt/UDISK/tn_save_data.json"),
+    )
+
+    def __init__(self, printer, config):
+        
+        # Default
+        self.printer = printer
+        self.config = config
+        self.logger = boxcfg_logger
         
+        self.logger.info("BoxCfg initializing...")
+
+        # Version Control
+        self.version = config.getint("version", default=1)
+        self.logger.info(f"BoxCfg using version {self.version} as per original [box]")
+        level = getattr(logging, config.get('log_level', 'error').upper(), logging.ERROR)
+        if self.logger.level != level:
+            self.logger.setLevel(level)
+
+        # Options from the schema, read in declaration order
+        for attr, option, getter, default in self._SCHEMA:
+            setattr(self, attr, getattr(config, getter)(option, default=default))
+        self.switch_pin = None
+
         printer.register_event_handler("connect", self._on_connect)
 
         self.logger.info("BoxCfg Registered BOX_SWITCH_READ Command.")
@@ -503,7 +1033,7 @@ class BoxAction:
     def __init__(self, printer, config):
         self.printer = printer
         self.config = config
-        self.logger = logging.getLogger("extras.creality_cfs.BoxAction")
+        self.logger = boxaction_logger
         self.logger.info("BoxAction initialized")
         self.boxcfg = self.printer.lookup_object("box").boxcfg  # assumes boxcfg exists
 
@@ -611,7 +1141,7 @@ class CFSWrapper:
         self.printer = config.get_printer()
         self.printer.add_object("box", self)
 
-        self.logger = logging.getLogger("extras.creality_cfs")
+        self.logger = logger
         self.logger.info("creality_cfs.py Initialised")
 
         # Use reactor/gcode helpers
@@ -1,12 +1,20 @@
 """
 Tests for the CFS protocol message structures.
 
-This module contains tests for the DataPackage class from the creality_cfs module,
-verifying that it correctly parses and reconstructs binary messages.
+This module contains tests for the DataPackage and MessageBlock classes from the
+creality_cfs module, verifying that they correctly parse and reconstruct binary
+messages, and for the CRC8 implementations they rely on.
 """
 
+import os
+import pickle
+import subprocess
+import sys
+from dataclasses import FrozenInstanceError
+
 import pytest
-from extras.creality_cfs import DataPackage
+from extras import creality_cfs
+from extras.creality_cfs import _CRC8_TABLE, CRC8Structure, DataPackage, MessageBlock
 
 
 @pytest.mark.parametrize(
@@ -64,3 +72,354 @@ def test_received_messages(msg):
     """
     item = DataPackage.loads(msg)
     assert item.message_block == msg
+
+
+def test_message_block_crc_covers_payload_only():
+    """
+    Test that a MessageBlock round-trips and its CRC8 covers only the payload.
+
+    A frame whose checksum also includes the length byte must be rejected.
+    """
+    frame = b'\xf7\x04\x10\x20\x30\x9c'
+    block = MessageBlock.loads(frame)
+
+    assert block.message_block == frame
+    assert block == MessageBlock(length=0x04, payload=[0x10, 0x20, 0x30], crc=0x9c)
+
+    with pytest.raises(ValueError):
+        MessageBlock.loads(b'\xf7\x04\x10\x20\x30\xc4')
+
+
+def test_equality_follows_wire_bytes():
+    """
+    Test that DataPackage equality and hashing are based on the serialized frame.
+
+    Two packages parsed from the same bytes compare equal and hash alike, while
+    packages for different frames do not compare equal.
+    """
+    first = DataPackage.loads(b'\xf7\x01\x03\x00\xa3\xdd')
+    second = DataPackage.loads(b'\xf7\x01\x03\x00\xa3\xdd')
+    other = DataPackage.loads(b'\xf7\x02\x03\x00\xa3\xdd')
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first != other
+    assert first != first.message_block
+
+
+def test_data_is_stored_as_bytes():
+    """
+    Test that the frame body is kept as a single bytes object.
+
+    Parsed frames keep the bytes between the header and the CRC, and a list of
+    ints passed by a caller is converted to the same bytes.
+    """
+    msg = b'\xf7\x01\x07\x00\x0a\x1c\x14\x00\x00\x48'
+    item = DataPackage.loads(msg)
+
+    assert type(item.data) is bytes
+    assert item.data == msg[5:-1]
+    assert DataPackage(
+        slave_addr=0x01,
+        length=0x07,
+        status=0x00,
+        function_code=0x0a,
+        data=[0x1c, 0x14, 0x00, 0x00],
+        crc=0x48,
+    ) == item
+
+
+def test_crc_is_calculated_when_omitted():
+    """
+    Test that a DataPackage built without a crc gets the correct checksum.
+
+    Packages constructed for sending do not need the caller to compute the CRC8;
+    the resulting frame matches one captured on the bus.
+    """
+    item = DataPackage(slave_addr=0x01, length=0x03, status=0x00, function_code=0xa3)
+
+    assert item.crc == 0xdd
+    assert item.message_block == b'\xf7\x01\x03\x00\xa3\xdd'
+
+
+def test_invalid_crc_is_rejected():
+    """
+    Test that an explicitly given crc is still validated.
+    """
+    with pytest.raises(ValueError):
+        DataPackage(slave_addr=0x01, length=0x03, status=0xff, function_code=0xa2, crc=0xda)
+
+    with pytest.raises(ValueError):
+        DataPackage.loads(b'\xf7\x01\x03\xff\xa2\xda')
+
+
+@pytest.mark.parametrize(
+    'cls, fields', [
+        pytest.param(DataPackage, dict(slave_addr=None, length=0x03, status=0x00, function_code=0xa3), id='DataPackage-none'),
+        pytest.param(DataPackage, dict(slave_addr=0x100, length=0x03, status=0x00, function_code=0xa3), id='DataPackage-range'),
+        pytest.param(MessageBlock, dict(length=None, payload=b'\x10'), id='MessageBlock-none'),
+        pytest.param(MessageBlock, dict(head=0x100, length=0x02, payload=b'\x10'), id='MessageBlock-range'),
+    ]
+)
+def test_invalid_header_is_rejected(cls, fields):
+    """
+    Test that a header field that is not a byte raises ValueError for both frame types.
+
+    Args:
+        cls: The frame class to construct
+        fields: Keyword arguments with one invalid header field
+    """
+    with pytest.raises(ValueError, match=f'Invalid {cls.__name__} header'):
+        cls(**fields)
+
+
+@pytest.mark.parametrize(
+    'cls, msg', [
+        pytest.param(DataPackage, b'', id='DataPackage-empty'),
+        pytest.param(DataPackage, b'\xf7', id='DataPackage-head-only'),
+        pytest.param(DataPackage, b'\xf7\x01\x03\x00\xa3', id='DataPackage-missing-crc'),
+        pytest.param(MessageBlock, b'', id='MessageBlock-empty'),
+        pytest.param(MessageBlock, b'\xf7\x01', id='MessageBlock-missing-crc'),
+    ]
+)
+def test_short_frame_is_rejected(cls, msg):
+    """
+    Test that frames shorter than the header plus crc raise ValueError.
+
+    Args:
+        cls: The frame class to parse the message with
+        msg: Truncated binary message
+    """
+    with pytest.raises(ValueError, match='too short'):
+        cls.loads(msg)
+
+
+def test_message_block_without_payload_is_parsed():
+    """
+    Test that the shortest MessageBlock, with an empty payload, still parses.
+    """
+    block = MessageBlock.loads(b'\xf7\x01\x00')
+
+    assert block.payload == b''
+    assert block.crc == 0x00
+    assert block.message_block == b'\xf7\x01\x00'
+
+
+@pytest.mark.parametrize(
+    'cls, msg', [
+        pytest.param(DataPackage, b'\xf7\x01\x07\x00\x0a\x1c\x14\x00\x00\x48', id='DataPackage'),
+        pytest.param(MessageBlock, b'\xf7\x04\x10\x20\x30\x9c', id='MessageBlock'),
+    ]
+)
+def test_packages_are_frozen_and_picklable(cls, msg):
+    """
+    Test that frame instances cannot be modified and survive pickling.
+
+    Frames hash and compare by their cached wire bytes, so assigning to or
+    deleting a field must fail, and unpickling must rebuild an equal frame.
+
+    Args:
+        cls: The frame class to parse the message with
+        msg: Binary message to parse
+    """
+    item = cls.loads(msg)
+
+    with pytest.raises(FrozenInstanceError):
+        item.crc = 0
+    with pytest.raises(FrozenInstanceError):
+        del item.crc
+
+    restored = pickle.loads(pickle.dumps(item))
+    assert type(restored) is cls
+    assert restored == item
+    assert hash(restored) == hash(item)
+    assert restored.message_block == msg
+
+
+def _reference_crc8(data):
+    """Bit-serial CRC8 with polynomial 0x07, as in the CFS firmware."""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07 if crc & 0x80 else crc << 1) & 0xFF
+    return crc
+
+
+def _sample_data(length):
+    """Deterministic test bytes of the given length, covering all byte values."""
+    return bytes((i * 31 + 7) & 0xFF for i in range(length))
+
+
+@pytest.fixture(scope='module')
+def crc8_numpy():
+    """
+    The numpy CRC8 backend, built even when int.bit_count makes it unnecessary.
+    """
+    calc = creality_cfs._load_crc8_numpy()
+    if calc is None:
+        pytest.skip('numpy is not installed')
+    return calc
+
+
+@pytest.fixture(scope='module')
+def crc8_numba():
+    """
+    The numba CRC8 backend, built even when the C helper is the one in use.
+    """
+    calc = creality_cfs._load_crc8_numba()
+    if calc is None:
+        pytest.skip('numba is not installed')
+    return calc
+
+
+@pytest.mark.parametrize('length', [0, 1, 2, 3, 4, 5, 8, 19])
+def test_crc8_kernel_matches_reference(length):
+    """
+    Test that the slice-by-4 CRC8 kernel agrees with the bit-serial algorithm.
+
+    The kernel is run uncompiled, so its folding is checked even without numba.
+
+    Args:
+        length: Number of bytes to checksum
+    """
+    data = _sample_data(length)
+    tables = creality_cfs._build_crc8_shift_rows(creality_cfs._CRC8_TABLE)
+    assert creality_cfs._crc8_kernel(data, tables) == _reference_crc8(data)
+
+
+@pytest.mark.skipif(creality_cfs._calc_crc8_c is None, reason='CRC8 C helper is unavailable')
+def test_crc8_c_table_matches_polynomial():
+    """
+    Test that the table written out in _crc8.c is the polynomial 0x07 table.
+
+    The CRC8 of a single byte is its table entry, so checking every byte value
+    covers the whole table.
+    """
+    for byte in range(256):
+        assert creality_cfs._calc_crc8_c(bytes((byte,))) == _reference_crc8([byte])
+
+
+@pytest.mark.parametrize(
+    'blocked', [
+        pytest.param('', id='default'),
+        # without cffi the C helper is skipped and numba is set up instead
+        pytest.param('cffi', id='without-cffi'),
+    ]
+)
+def test_module_imports_under_both_names(blocked):
+    """
+    Test that the module imports both as extras.creality_cfs and as creality_cfs.
+
+    Klipper imports it from the extras package, while pyproject also puts extras
+    itself on the path. Each import runs in a fresh interpreter, one after the
+    other, so on-disk caches written under the first name are read under the
+    second, and the optional CRC8 backends must fall back rather than fail.
+
+    Args:
+        blocked: Optional module to hide from the import, or an empty string
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data = _sample_data(64)
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONPATH'}
+    block = f"import sys; sys.modules[{blocked!r}] = None; " if blocked else ""
+    for cwd, name in ((root, 'extras.creality_cfs'), (os.path.join(root, 'extras'), 'creality_cfs')):
+        code = f"{block}import {name} as m; print(m.CRC8Structure._calc_crc8({data!r}))"
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=cwd, env=env, capture_output=True, text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert int(result.stdout) == _reference_crc8(data)
+
+
+def test_crc8_table_matches_polynomial():
+    """
+    Test that the generated CRC8 lookup table is the canonical polynomial 0x07 table.
+    """
+    assert _CRC8_TABLE[:8] == (0x00, 0x07, 0x0e, 0x09, 0x1c, 0x1b, 0x12, 0x15)
+    assert _CRC8_TABLE[-1] == 0xf3
+    assert _CRC8_TABLE == tuple(_reference_crc8([byte]) for byte in range(256))
+    # standard CRC-8 check value
+    assert CRC8Structure._calc_crc8(b'123456789') == 0xf4
+
+
+@pytest.mark.parametrize('backend', ['c', 'numba', 'swar', 'numpy', 'table'])
+@pytest.mark.parametrize('length', [0, 1, 31, 32, 33, 34, 35, 63, 64, 100, 127, 128, 255, 256, 257, 600])
+def test_crc8_matches_reference(request, monkeypatch, backend, length):
+    """
+    Test that each CRC8 code path, as chosen by the dispatch, agrees with the
+    bit-serial algorithm.
+
+    The backends the dispatch would otherwise prefer are disabled, so that the
+    requested one is actually exercised; the lengths straddle the thresholds at
+    which the compiled, SWAR and numpy implementations take over from the table
+    loop, and cover every tail the slice-by-4 numba kernel can leave.
+
+    Args:
+        request: The pytest request, used to build the numba and numpy backends on demand
+        monkeypatch: Fixture used to select the backend
+        backend: Name of the CRC8 code path to exercise
+        length: Number of bytes to checksum
+    """
+    if backend == 'c':
+        if creality_cfs._calc_crc8_c is None:
+            pytest.skip('CRC8 C helper is unavailable')
+        native = creality_cfs._calc_crc8_c
+    elif backend == 'numba':
+        native = request.getfixturevalue('crc8_numba')
+    else:
+        native = None
+    monkeypatch.setattr(creality_cfs, '_calc_crc8_native', native)
+
+    if backend == 'swar' and creality_cfs._CRC8_PARITY_MASKS is None:
+        pytest.skip('int.bit_count is unavailable')
+    if backend != 'swar':
+        monkeypatch.setattr(creality_cfs, '_CRC8_PARITY_MASKS', None)
+
+    numpy_path = request.getfixturevalue('crc8_numpy') if backend == 'numpy' else None
+    monkeypatch.setattr(creality_cfs, '_calc_crc8_numpy', numpy_path)
+
+    data = _sample_data(length)
+    assert CRC8Structure._calc_crc8(data) == _reference_crc8(data)
+    assert CRC8Structure._calc_crc8(memoryview(data)) == _reference_crc8(data)
+    assert CRC8Structure._calc_crc8(list(data)) == _reference_crc8(data)
+
+
+@pytest.mark.parametrize(
+    'msg, valid', [
+        pytest.param(b'\xf7\x01\x03\x00\xa3\xdd', True, id='valid'),
+        pytest.param(memoryview(b'\x00\xf7\x01\x03\x00\xa3\xdd\x00')[1:-1], True, id='valid-memoryview'),
+        pytest.param(b'\xf7\x01\x03\xff\xa2\xda', False, id='invalid-crc'),
+        pytest.param(b'\xf7\x01\x03\x00\xa3', False, id='truncated'),
+        pytest.param(b'', False, id='empty'),
+    ]
+)
+def test_validate_frame(msg, valid):
+    """
+    Test that validate_frame accepts exactly the frames loads() can parse.
+
+    Args:
+        msg: Binary message to check
+        valid: Whether the message is a valid frame
+    """
+    assert DataPackage.validate_frame(msg) is valid
+
+
+@pytest.mark.parametrize(
+    'msg, valid', [
+        pytest.param(b'\xf7\x04\x10\x20\x30\x9c', True, id='valid'),
+        pytest.param(memoryview(b'\x00\xf7\x04\x10\x20\x30\x9c')[1:], True, id='valid-memoryview'),
+        pytest.param(b'\xf7\x01\x00', True, id='empty-payload'),
+        pytest.param(b'\xf7\x04\x10\x20\x30\xc4', False, id='crc-over-length'),
+        pytest.param(b'\xf7\x01', False, id='truncated'),
+    ]
+)
+def test_message_block_validate_frame(msg, valid):
+    """
+    Test that MessageBlock.validate_frame checks the payload-only CRC8.
+
+    Args:
+        msg: Binary message to check
+        valid: Whether the message is a valid frame
+    """
+    assert MessageBlock.validate_frame(msg) is valid